@@ -2,7 +2,8 @@
 This module handles the loading screen and animation for the application.
 """
 
-import time
+import functools
+import threading
 from pathlib import Path
 from tkinter import SUNKEN, Frame, Label, Tk
 
@@ -45,24 +46,52 @@ label2.place(x=10, y=215)
 base_dir: Path = Path(__file__).resolve().parent.parent
 image_path_c1 = base_dir / "assets" / "c1.png"
 image_path_c2 = base_dir / "assets" / "c2.png"
-image_a = ImageTk.PhotoImage(Image.open(image_path_c2))
-image_b = ImageTk.PhotoImage(Image.open(image_path_c1))
 
 
-def load_animation(loop=4):
-    """Function to manage loading animation."""
-    for _ in range(loop):
-        for img, x_coord in zip(
-            [image_a, image_b, image_b, image_b], [180, 200, 220, 240]
-        ):
-            Label(w, image=img, border=0, relief=SUNKEN).place(x=x_coord, y=145)  # type: ignore
-            w.update_idletasks()
-            time.sleep(0.5)
+@functools.lru_cache(maxsize=8)
+def _get_photo(path: str) -> ImageTk.PhotoImage:
+    """Decode an image once and keep the PhotoImage alive for the splash window."""
+    return ImageTk.PhotoImage(Image.open(path), master=w)
+
+
+def load_animation(loop=4, on_done=None):
+    """Function to manage loading animation.
+
+    Frames are scheduled with ``w.after`` so the Tk event loop stays responsive
+    between them; ``on_done`` is called once the last frame has been shown.
+    """
+    image_a = _get_photo(str(image_path_c2))
+    image_b = _get_photo(str(image_path_c1))
+    frames = [image_a, image_b, image_b, image_b]
+    total_frames = loop * len(frames)
+
+    # One persistent label per dot; each tick only swaps the image shown.
+    dots = [Label(w, border=0, relief=SUNKEN, bg="#272727") for _ in frames]
+    for i, dot in enumerate(dots):
+        dot.place(x=180 + 20 * i, y=145)
+
+    def _tick(index: int = 0):
+        if index >= total_frames:
+            if on_done is not None:
+                on_done()
+            return
+        position = index % len(frames)
+        dots[position].configure(image=frames[position])  # type: ignore
+        w.after(500, _tick, index + 1)
+
+    _tick()
+
+
+def _prewarm():
+    """Import the automation modules while the splash is still animating."""
+    # pylint: disable=import-outside-toplevel,unused-import
+    from src import play  # noqa: F401
 
 
 def launch_main():
     """Main loop for managing animation while download is in progress."""
-    load_animation(1)
+    threading.Thread(target=_prewarm, daemon=True).start()
+    load_animation(1, on_done=w.quit)
+    w.mainloop()  # Runs until the animation calls w.quit
     w.destroy()  # Destroy the loading window
     new_win()  # Launch the main application window
-    w.mainloop()
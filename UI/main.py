@@ -1,5 +1,5 @@
+import collections
 import logging
-import os
 import random
 import threading
 import time
@@ -8,6 +8,7 @@ from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 from tkinter import filedialog
+from typing import ClassVar
 
 import customtkinter
 from CTkMessagebox import CTkMessagebox
@@ -20,6 +21,19 @@ from .utils import FloatSpinbox
 customtkinter.set_appearance_mode("System")
 customtkinter.set_default_color_theme("blue")
 
+_BASE_DIR: Path = Path(__file__).resolve().parent.parent
+_ASSETS: Path = _BASE_DIR / "assets"
+
+_BOLD_FONTS: dict[int, customtkinter.CTkFont] = {}
+
+
+def _bold_font(size: int) -> customtkinter.CTkFont:
+    """Return the shared bold CTkFont of the given size, creating it on first use."""
+    if size not in _BOLD_FONTS:
+        _BOLD_FONTS[size] = customtkinter.CTkFont(size=size, weight="bold")
+    return _BOLD_FONTS[size]
+
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
@@ -33,22 +47,58 @@ class PlayPause(str, Enum):
 
 
 class TextHandler(logging.Handler):
+    MAX_LINES = 500
+
     def __init__(self, text):
         logging.Handler.__init__(self)
         self.text = text
+        # records are buffered and written to the textbox in one batch
+        self._buf = collections.deque()
+        self._pending = False
+        self.enabled = True
+        # ring buffer of the rendered lines, oldest lines fall off the front
+        self._lines: collections.deque[str] = collections.deque(
+            self.text.get("1.0", "end-1c").splitlines(), maxlen=self.MAX_LINES
+        )
 
     def emit(self, record):
         msg = self.format(record)
+        if not self.enabled:
+            # keep the history for save_error_log but skip all Tk work
+            self._lines.extend(msg.splitlines())
+            return
+        self._buf.append(msg)
+        if not self._pending:
+            self._pending = True
+            self.text.after(50, self._flush)
+
+    def set_enabled(self, enabled: bool):
+        """Turn the textbox updates on or off, catching up when turned back on."""
+        self.enabled = enabled
+        if enabled:
+            self.render()
+
+    def _flush(self):
+        self._pending = False
+        if not self._buf:
+            return
+        self.render()
+
+    def render(self):
+        """Write the buffered log lines into the textbox."""
+        self.acquire()
+        try:
+            while self._buf:
+                self._lines.extend(self._buf.popleft().splitlines())
+            blob = "\n".join(self._lines) + "\n"
+        finally:
+            self.release()
         self.text.configure(state="normal")
-        self.text.insert(tkinter.END, msg + "\n")
-        # Limit the number of lines to 100
-        num_lines = int(self.text.index("end-1c").split(".")[0])
-        if num_lines > 500:
-            self.text.delete("1.0", f"{num_lines-100}.0")
+        self.text.delete("1.0", tkinter.END)
+        self.text.insert(tkinter.END, blob)
         self.text.configure(state="disabled")
         # Autoscroll to the bottom
         self.text.yview(tkinter.END)
-        # add color to log message last line
 
 
 class App(customtkinter.CTk):
@@ -62,15 +112,20 @@ class App(customtkinter.CTk):
         self.stop = True
         self.filename = None
         self.debug_mode_val = False
+        self._last_progress: tuple = (-1, -1)
+        self._last_ratio: float = 0.0
+        self._message_boxes: dict[str, CTkMessagebox] = {}
 
         self.sidebar_frame = SideBarFrame(self, width=140, corner_radius=0)
         self.sidebar_frame.grid(row=0, column=0, rowspan=4, sticky="nsew")
 
+        # progress widgets are built once and only gridded while processing
         self.progressbar_1 = customtkinter.CTkProgressBar(self)
-        self.progressbar_1.grid(
-            row=0, column=1, padx=(20, 0), pady=(20, 0), sticky="ew"
+        self.progress_label = customtkinter.CTkLabel(
+            self,
+            text="Processing...",
+            font=_bold_font(20),
         )
-        self.progressbar_1.grid_forget()
 
         # create file upload button
         # user_input goes here
@@ -79,19 +134,23 @@ class App(customtkinter.CTk):
 
         # create textbox
         self.textbox = customtkinter.CTkTextbox(self, width=250)
-        self.textbox.grid(row=0, column=1, padx=(20, 0), pady=(20, 0), sticky="nsew")
         self.textbox.insert("0.0", "No logs yet.\n")
 
         # create logging handler
         self.text_handler = TextHandler(self.textbox)
         self.text_handler.setLevel(logging.INFO)
-        logging.getLogger().addHandler(self.text_handler)
-        logging.getLogger().setLevel(logging.INFO)
-        self.textbox.grid_forget()
+        root_logger = logging.getLogger()
+        # drop handlers left behind by a previous App instance
+        for handler in root_logger.handlers[:]:
+            if isinstance(handler, TextHandler):
+                root_logger.removeHandler(handler)
+        root_logger.addHandler(self.text_handler)
+        root_logger.setLevel(logging.INFO)
+        self.text_handler.set_enabled(False)
 
     def __basic_setup(self):
-        self.current_dir: Path = Path(__file__).resolve().parent.parent
-        self.assert_dir = self.current_dir / "assets"
+        self.current_dir: Path = _BASE_DIR
+        self.assert_dir = _ASSETS
         # configure window
         self.title("Robot Automation")
         self.geometry("1445x800")
@@ -110,6 +169,8 @@ class App(customtkinter.CTk):
 
         # update progress bar total
         self.progressbar_1.set(0)
+        self._last_progress = (-1, -1)
+        self._last_ratio = 0.0
 
         self.progressbar_1.grid(
             # set below the textbox
@@ -120,17 +181,25 @@ class App(customtkinter.CTk):
             sticky="ew",
         )
         # add progress label
-        self.progress_label = customtkinter.CTkLabel(
-            self,
-            text="Processing...",
-            font=customtkinter.CTkFont(size=20, weight="bold"),
-        )
         self.progress_label.grid(
             row=1, column=1, padx=(20, 0), pady=(20, 0), sticky="ew"
         )
 
+    def _show_message(self, kind: str, **kwargs) -> CTkMessagebox:
+        # reuse the box of the same kind while it is still open instead of
+        # building another toplevel window on top of it
+        box = self._message_boxes.get(kind)
+        if box is not None and box.winfo_exists():
+            box.info.configure(text=kwargs["message"])
+            box.lift()
+            return box
+        box = CTkMessagebox(**kwargs)
+        self._message_boxes[kind] = box
+        return box
+
     def complete_progress(self):
-        CTkMessagebox(
+        self._show_message(
+            "completed",
             title="completed",
             message="Processing Completed",
             icon="check",
@@ -138,19 +207,26 @@ class App(customtkinter.CTk):
         )
 
     def update_progress(self, total, processed):
+        # nothing to redraw when the counters did not move
+        if (processed, total) == self._last_progress:
+            return
+        self._last_progress = (processed, total)
         try:
-            convert_processed_range_0_1 = int(processed) / int(total)
-        except ZeroDivisionError:
-            convert_processed_range_0_1 = 0
-        except ValueError:
-            convert_processed_range_0_1 = 0
-        except Exception as e:
-            convert_processed_range_0_1 = 0
-            logging.error("Error: %s", e)
-        print(convert_processed_range_0_1)
-        self.progressbar_1.set(convert_processed_range_0_1)
+            total_count, processed_count = int(total), int(processed)
+        except (TypeError, ValueError):
+            return
+        ratio = processed_count / total_count if total_count > 0 else 0.0
+        # the bar cannot show a change smaller than one pixel, before it is laid
+        # out its width is still 1 so always set it then
+        bar_width = self.progressbar_1.winfo_width()
+        if (
+            bar_width <= 1
+            or abs(ratio - self._last_ratio) >= 1 / bar_width
+            or ratio in (0.0, 1.0)
+        ):
+            self.progressbar_1.set(ratio)
+            self._last_ratio = ratio
         self.progress_label.configure(text=f"Processing... {processed}/{total}")
-        print(f"Processing... {processed}/{total}")
 
     def start_process(self, user_ip, total, processed):
         from src.play import main
@@ -164,10 +240,11 @@ class App(customtkinter.CTk):
         # add this message to upload button text
         # self.file_upload.configure(text=message)
         # Show some error message
-        CTkMessagebox(title="Error", message=message, icon="cancel")
+        self._show_message("error", title="Error", message=message, icon="cancel")
 
     def save_error_log(self):
         # this fucton save log from textbox to file
+        self.text_handler.render()
         current_dir_cwd = Path.cwd()
         log_path = current_dir_cwd / f"error_log-{time.time()}.txt"
         with open(log_path, "w", encoding="utf-8") as f:
@@ -199,7 +276,7 @@ class SideBarFrame(customtkinter.CTkFrame):
         self.logo_label = customtkinter.CTkLabel(
             self,
             text="Home",
-            font=customtkinter.CTkFont(size=20, weight="bold"),
+            font=_bold_font(20),
         )
         self.logo_label.grid(row=0, column=0, padx=30, pady=(20, 10))
         # create CTkSwitch
@@ -217,7 +294,7 @@ class SideBarFrame(customtkinter.CTkFrame):
             self,
             text="Delay in seconds Range:",
             anchor="w",
-            font=customtkinter.CTkFont(size=10, weight="bold"),
+            font=_bold_font(10),
         )
         self.delay_label.grid(row=2, column=0, padx=20, pady=(10, 0))
         self.delay_val_min = FloatSpinbox(self, step_size=1, start=20, end=999)
@@ -225,11 +302,17 @@ class SideBarFrame(customtkinter.CTkFrame):
         self.delay_val_max = FloatSpinbox(self, step_size=1, start=20, end=999)
         self.delay_val_max.set(37)
         self.delay_val_max.grid(row=4, column=0, padx=20, pady=(10, 0))
+        # the automation thread reads these cached bounds instead of the entries
+        self._delay_min: float = 20.0
+        self._delay_max: float = 37.0
+        self._refresh_delay_bounds()
+        self.delay_val_min.add_change_callback(self._refresh_delay_bounds)
+        self.delay_val_max.add_change_callback(self._refresh_delay_bounds)
 
         self.timer_label = customtkinter.CTkLabel(
             self,
             text="Last Run Time",
-            font=customtkinter.CTkFont(size=20, weight="bold"),
+            font=_bold_font(20),
         )
         self.timer_label.grid(row=8, column=0, padx=30, pady=(20, 10))
         self.timer = Timer(self)
@@ -296,11 +379,13 @@ class SideBarFrame(customtkinter.CTkFrame):
 
     def reset_buttons(self):
         self.debug_mode.deselect()
+        self.master.text_handler.set_enabled(False)  # type: ignore
         self.stop_btn.destroy()
         self.pause_play_btn.destroy()
 
     def toggle_debug_mode(self):
         self.debug_mode_val = self.debug_mode.get()
+        self.master.text_handler.set_enabled(bool(self.debug_mode_val))  # type: ignore
         if not self.debug_mode_val:
             self.master.textbox.grid_forget()  # type: ignore
             return
@@ -310,16 +395,14 @@ class SideBarFrame(customtkinter.CTkFrame):
                 row=0, column=1, padx=(20, 0), pady=(20, 0), sticky="nsew"
             )
 
-    def get_delay_value(self) -> float:
-        min_val: float = 20.0
-        max_val: float = 37.0
-        min_val_get = self.delay_val_min.get()
-        max_val_get = self.delay_val_max.get()
-        if min_val_get:
-            min_val = min_val_get
-        if max_val_get:
-            max_val = max_val_get
+    def _refresh_delay_bounds(self):
+        self._delay_min = float(self.delay_val_min.get() or 20.0)
+        self._delay_max = float(self.delay_val_max.get() or 37.0)
 
+    def get_delay_value(self) -> float:
+        min_val, max_val = self._delay_min, self._delay_max
+        if min_val == max_val:
+            return min_val
         # genreate random number between min and max
         return random.uniform(min_val, max_val)
 
@@ -341,10 +424,15 @@ class UserInputData:
 
 
 class UserInput(customtkinter.CTkFrame):
+    # decoded once and shared by every UserInput instance
+    _upload_icon: ClassVar[customtkinter.CTkImage | None] = None
+
     def __init__(self, master: App, *args, **kwargs):
         self.master: App = master  # type: ignore
         super().__init__(master=master, *args, **kwargs)
         self.filename = None
+        self.credentials_path: Path = Path.cwd() / "credentials.txt"
+        self._cached_creds: tuple[str, str, str] | None = None
         # inputs are
         # 1. user name
         # 2. password
@@ -377,15 +465,15 @@ class UserInput(customtkinter.CTkFrame):
         self.game_url_entry.grid(row=2, column=1, padx=10, pady=10, columnspan=3)
 
         # create file upload button
-        img_path = self.master.assert_dir / "photo.png"
-        img = Image.open(img_path)
-        img = customtkinter.CTkImage(img, img, size=(20, 20))
+        if UserInput._upload_icon is None:
+            img = Image.open(_ASSETS / "photo.png")
+            UserInput._upload_icon = customtkinter.CTkImage(img, img, size=(20, 20))
         self.file_upload = customtkinter.CTkButton(
             self,
             text="Upload File",
             corner_radius=0,
             command=self.submit,
-            image=img,
+            image=UserInput._upload_icon,
             fg_color="#3d98d4",
             hover=True,
             hover_color="#5c91b8",
@@ -399,6 +487,11 @@ class UserInput(customtkinter.CTkFrame):
             row=3, column=0, columnspan=4, padx=(20, 0), pady=(20, 0), sticky="nsew"
         )
 
+        # shown while the selected file is being validated
+        self.validation_progress = customtkinter.CTkProgressBar(
+            self, mode="indeterminate"
+        )
+
         # create submit button
         # merge the two columns
         # self.submit_button = customtkinter.CTkButton(self, text="Submit",command=self.submit)
@@ -412,17 +505,19 @@ class UserInput(customtkinter.CTkFrame):
         self.game_url_entry.delete(0, tkinter.END)
 
     def load_from_file(self):
-        current_dir_cwd = os.getcwd()
-        credentials_path = Path(current_dir_cwd) / "credentials.txt"
-        if not credentials_path.exists():
-            return
-        with open(credentials_path, "r") as f:
-            lines = f.readlines()
-            if len(lines) == 3:
-                self.clear_entries()
-                self.user_name_entry.insert(0, lines[0].strip())
-                self.password_entry.insert(0, lines[1].strip())
-                self.game_url_entry.insert(0, lines[2].strip())
+        # the values saved during this session are already in memory
+        if self._cached_creds is None:
+            if not self.credentials_path.exists():
+                return
+            lines = self.credentials_path.read_text(encoding="utf-8").splitlines()
+            if len(lines) < 3:
+                return
+            self._cached_creds = (lines[0], lines[1], lines[2])
+        user_name, password, game_url = self._cached_creds
+        self.clear_entries()
+        self.user_name_entry.insert(0, user_name.strip())
+        self.password_entry.insert(0, password.strip())
+        self.game_url_entry.insert(0, game_url.strip())
 
     def validate_input(self):
         inputs = {}
@@ -434,7 +529,7 @@ class UserInput(customtkinter.CTkFrame):
             if not value or value.strip() == "":
                 error_message += f"{key} cannot be empty\n"
         if error_message:
-            CTkMessagebox(title="Error", message=error_message, icon="cancel")
+            self.master.add_error_label(error_message)
             return False
         return True
 
@@ -452,15 +547,36 @@ class UserInput(customtkinter.CTkFrame):
         if not self.filename.exists() or not self.filename.is_file():
             self.master.add_error_label("Upload File \n Error: File not found")
             return
-        info, is_valid = validate_data_frame(self.filename)
+        return self.filename
 
+    def _start_validation(self, filename: Path):
+        # reading the workbook can take seconds, keep it off the Tk thread
+        self.file_upload.configure(state="disabled")
+        self.validation_progress.grid(
+            row=4, column=0, columnspan=4, padx=(20, 0), pady=(10, 0), sticky="ew"
+        )
+        self.validation_progress.start()
+        threading.Thread(
+            target=self._validate_worker, args=(filename,), daemon=True
+        ).start()
+
+    def _validate_worker(self, filename: Path):
+        info, is_valid = validate_data_frame(filename)
+        self.master.after(0, self._on_validation_done, info, is_valid)
+
+    def _on_validation_done(self, info: tuple, is_valid: bool):
+        self.validation_progress.stop()
+        self.validation_progress.grid_forget()
+        self.file_upload.configure(state="normal")
         if not is_valid:
             self.master.add_error_label(
                 "Upload File \n Error: Combination column not found"
             )
             return
         user_ip = self.create_user_input_data()
-        return user_ip, info[1], info[0]
+        total, processed = info[1], info[0]
+        self.master.sidebar_frame.create_pause_play_stop_btn()
+        self.master.start_process(user_ip, total, processed)
 
     def create_user_input_data(self) -> UserInputData:
         return UserInputData(
@@ -472,29 +588,32 @@ class UserInput(customtkinter.CTkFrame):
         )
 
     def save_to_file(self):
-        current_dir_cwd = os.getcwd()
-        credentials_path = Path(current_dir_cwd) / "credentials.txt"
-        with open(credentials_path, "w") as f:
-            f.write(self.user_name_entry.get() + "\n")
-            f.write(self.password_entry.get() + "\n")
-            f.write(self.game_url_entry.get() + "\n")
+        credentials = (
+            self.user_name_entry.get(),
+            self.password_entry.get(),
+            self.game_url_entry.get(),
+        )
+        if credentials == self._cached_creds:
+            return
+        self.credentials_path.write_text(
+            "\n".join(credentials) + "\n", encoding="utf-8"
+        )
+        self._cached_creds = credentials
 
     def submit(self):
         if not self.validate_input():
             return
         self.save_to_file()
-        select_file_response = self.select_file()
-        if not select_file_response:
+        filename = self.select_file()
+        if filename is None:
             return
-        user_ip, total, processed = select_file_response
-        self.master.sidebar_frame.create_pause_play_stop_btn()
-        self.master.start_process(user_ip, total, processed)
+        self._start_validation(filename)
         # call main function
         # main()
         # check_csv_file_has_query_column()
 
 
-class Timer(customtkinter.CTkFrame):
+class Timer(customtkinter.CTkFrame):  # pylint: disable=too-many-instance-attributes
     def __init__(self, master, *args, **kwargs):
         super().__init__(master=master, *args, **kwargs)
         self.grid_columnconfigure(0, weight=1)
@@ -505,31 +624,57 @@ class Timer(customtkinter.CTkFrame):
         self.timer_label = customtkinter.CTkLabel(
             self,
             text="00:00:00",
-            font=customtkinter.CTkFont(size=20, weight="bold"),
+            font=_bold_font(20),
         )
         self.timer_label.grid(row=0, column=0, padx=30, pady=(20, 10))
         self.combination_process_label = customtkinter.CTkLabel(
             self,
             text=f"Combination Process : {self.combination_process}",
-            font=customtkinter.CTkFont(size=10, weight="bold"),
+            font=_bold_font(10),
         )
         self.combination_process_label.grid(row=1, column=0, padx=30, pady=(20, 10))
         self.start_time = 0
+        # elapsed time is derived from monotonic anchors so after() drift
+        # does not accumulate into the displayed value
+        self._anchor = time.monotonic()
+        self._paused_accum = 0.0
+        self._pause_started: float | None = None
+        self._last_timer_text = ""
+        self._shown_process = self.combination_process
+
+    def _elapsed(self) -> float:
+        now = time.monotonic()
+        paused = self._paused_accum
+        if self._pause_started is not None:
+            paused += now - self._pause_started
+        return now - self._anchor - paused
 
     def update_timer(self):
         if self.is_stop:
             return
-        if self.is_paused is False:
-            self.start_time += 1  # increment by 1 second
+        elapsed = self._elapsed()
+        self.start_time = int(elapsed)
         hours, remainder = divmod(self.start_time, 3600)
         minutes, seconds = divmod(remainder, 60)
-        self.timer_label.configure(
-            text=f"{int(hours):02d}:{int(minutes):02d}:{int(seconds):02d}"
-        )
+        timer_text = f"{int(hours):02d}:{int(minutes):02d}:{int(seconds):02d}"
+        if timer_text != self._last_timer_text:
+            self.timer_label.configure(text=timer_text)
+            self._last_timer_text = timer_text
+        # wake up on the next whole second
+        self.after(1000 - int(elapsed * 1000) % 1000, self.update_timer)
+
+    def set_combination_process(self, value: int):
+        """Update the processed count; safe to call from the worker thread."""
+        self.combination_process = value
+        self.after(0, self._refresh_count)
+
+    def _refresh_count(self):
+        if self.combination_process == self._shown_process:
+            return
+        self._shown_process = self.combination_process
         self.combination_process_label.configure(
             text=f"Combination Process : {self.combination_process}"
         )
-        self.after(1000, self.update_timer)  # run every 1 second
 
     # method are
     # 1. start
@@ -540,18 +685,28 @@ class Timer(customtkinter.CTkFrame):
         self._reset()
         self.start_time = 0
         self.combination_process = 0
+        self._refresh_count()
+        self._anchor = time.monotonic()
+        self._paused_accum = 0.0
         self.update_timer()
 
     def pause(self):
         self.is_paused = not self.is_paused
+        if self.is_paused:
+            self._pause_started = time.monotonic()
+        elif self._pause_started is not None:
+            self._paused_accum += time.monotonic() - self._pause_started
+            self._pause_started = None
 
     def stop(self):
         self.is_stop = True
 
     def _reset(self):
         self.timer_label.configure(text="00:00:00")
+        self._last_timer_text = "00:00:00"
         self.is_stop = False
         self.is_paused = False
+        self._pause_started = None
 
 
 if __name__ == "__main__":
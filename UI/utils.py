@@ -3,15 +3,17 @@ This module contains utility functions and classes used by the UI components.
 
 """
 
+import atexit
+import sys
 import tempfile
+import tkinter
 from pathlib import Path
-from typing import Callable
+from typing import IO, Callable
 
 import customtkinter as ctk
-import portalocker
 
 
-class FloatSpinbox(ctk.CTkFrame):  # pylint: disable=too-many-ancestors
+class FloatSpinbox(ctk.CTkFrame):  # pylint: disable=too-many-ancestors,too-many-instance-attributes
     """A custom tkinter frame that contains a spinbox for floating point numbers."""
 
     def __init__(  # pylint: disable=too-many-arguments
@@ -28,6 +30,10 @@ class FloatSpinbox(ctk.CTkFrame):  # pylint: disable=too-many-ancestors
         super().__init__(*args, width=width, height=height, **kwargs)
 
         self.step_size = step_size
+        # the entry only holds integers, so the step is resolved once here
+        self._step: int = (
+            max(int(step_size), 1) if isinstance(step_size, (int, float)) else 1
+        )
         self.command = command
         self.start = start
         self.end = end
@@ -47,8 +53,10 @@ class FloatSpinbox(ctk.CTkFrame):  # pylint: disable=too-many-ancestors
         self.subtract_button.grid(row=0, column=0, padx=(3, 0), pady=3)
 
         validate_cmd = self.register(self._validate_numeric)
+        self._var = tkinter.StringVar(self)
         self.entry = ctk.CTkEntry(
             self,
+            textvariable=self._var,
             width=width - (2 * height),
             height=height - 6,
             border_width=0,
@@ -70,51 +78,38 @@ class FloatSpinbox(ctk.CTkFrame):  # pylint: disable=too-many-ancestors
         self.entry.insert(0, str(start))
 
     def _validate_numeric(self, new_value):
-        if new_value == "":
-            return True
-        try:
-            int(new_value)
+        # runs on every keystroke, so avoid int() and its exception path
+        if not new_value or new_value == "-":
             return True
-        except ValueError:
-            return False
+        digits = new_value[1:] if new_value[0] in "+-" else new_value
+        return digits.isascii() and digits.isdigit()
 
     def _add_button_callback(self):
-        if self.command is not None:
-            self.command()
-        try:
-            if isinstance(self.step_size, int):
-                value = int(self.entry.get()) + self.step_size
-                if value > self.end:
-                    value = self.start
-            else:
-                value = int(self.entry.get()) + self.step_size
-
-            if value > self.end:
-                value = self.start
-            self.entry.delete(0, "end")
-            self.entry.insert(0, value)
-        except ValueError:
-            return None
-        return None
+        self._step_by(1)
 
     def _subtract_button_callback(self):
+        self._step_by(-1)
+
+    def _step_by(self, sign: int):
+        """Move the value one step in the direction of sign, wrapping at the bounds."""
         if self.command is not None:
             self.command()
+        current = self.entry.get()
         try:
-            if isinstance(self.step_size, int) is False:
-                try:
-                    self.step_size = int(self.step_size)
-                except ValueError:
-                    self.step_size = 1
-
-            value = int(self.entry.get()) - self.step_size
-            if value < self.start:
-                value = self.end
-            self.entry.delete(0, "end")
-            self.entry.insert(0, value)
+            value = int(current) + sign * self._step
         except ValueError:
-            return None
-        return None
+            return
+        if value > self.end:
+            value = self.start
+        elif value < self.start:
+            value = self.end
+        if str(value) != current:
+            self.entry.delete(0, "end")
+            self.entry.insert(0, str(value))
+
+    def add_change_callback(self, callback: Callable[[], None]):
+        """Call callback every time the text of the spinbox changes."""
+        self._var.trace_add("write", lambda *_: callback())
 
     def get(self) -> float | None:
         """Get the value of the spinbox.
@@ -133,38 +128,70 @@ class FloatSpinbox(ctk.CTkFrame):  # pylint: disable=too-many-ancestors
         self.entry.insert(0, str(int(value)))
 
 
+_LOCK_FILE_PATH: Path = Path(tempfile.gettempdir()) / "robot_automation_UI_LOCK"
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _lock_file(lock_file: IO[str]) -> None:
+        """Lock the first byte of the file, raise OSError if it is already locked."""
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+
+    def _unlock_file(lock_file: IO[str]) -> None:
+        """Unlock the first byte of the file."""
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock_file(lock_file: IO[str]) -> None:
+        """Lock the file, raise OSError if it is already locked."""
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def _unlock_file(lock_file: IO[str]) -> None:
+        """Unlock the file."""
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
 class LockFileManager:
     """A class to manage the lock file for the application."""
 
     def __init__(self):
-        self.lock_file = None
+        self.lock_file: IO[str] | None = None
+        self._path: Path = self.get_lock_file_path()
+        # make sure the lock is released even if the app exits without finally
+        atexit.register(self.release_lock)
 
     def get_lock_file_path(self) -> Path:
-        """Generate the lock file path in the system temporary directory."""
-        temp_dir = Path(tempfile.gettempdir())
-        return temp_dir / "robot_automation_UI_LOCK"
+        """Get the lock file path in the system temporary directory."""
+        return _LOCK_FILE_PATH
 
     def is_already_running(self) -> bool:
         """Check if the application is already running using a temporary lock file."""
-        lock_file_path = self.get_lock_file_path()
-
+        # "a+" does not truncate a lock file held by another instance
+        lock_file = open(  # pylint: disable=consider-using-with
+            self._path, "a+", encoding="utf-8"
+        )
         try:
-            # Open the lock file in write mode
-            self.lock_file = lock_file_path.open("w")
-            portalocker.lock(self.lock_file, portalocker.LOCK_EX | portalocker.LOCK_NB)
-        except portalocker.LockException:
+            _lock_file(lock_file)
+        except OSError:
+            lock_file.close()
             return True
+        self.lock_file = lock_file
         return False
 
     def release_lock(self):
         """Release the lock and clean up the temporary lock file."""
+        if self.lock_file is None:
+            # never acquired or already released, the file belongs to someone else
+            return
         try:
-            if self.lock_file:
-                portalocker.unlock(self.lock_file)
-                self.lock_file.close()
+            _unlock_file(self.lock_file)
+            self.lock_file.close()
+            self.lock_file = None
             # Remove the lock file from the temporary directory
-            lock_file_path = self.get_lock_file_path()
-            if lock_file_path.exists():
-                lock_file_path.unlink(missing_ok=True)
+            self._path.unlink(missing_ok=True)
         except Exception as e:  # pylint: disable=broad-except
             print(f"Error releasing lock: {e}")
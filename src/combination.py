@@ -5,17 +5,66 @@ It also validates the file path and the data frame.
 """
 
 import logging
+import os
+import stat
 import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
 from enum import Enum
 from pathlib import Path
 
 import pandas as pd
 
 
+class ReadWriteLock:
+    """Lock that lets many readers in at once but gives a writer exclusive access
+
+    Waiting writers block new readers so a steady stream of reads cannot
+    starve a write.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """Hold the lock for reading"""
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """Hold the lock for writing"""
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
 class Locking:  # pylint: disable=too-few-public-methods
     """Locking class to handle the thread lock"""
 
-    lock = threading.Lock()
+    lock = ReadWriteLock()
 
 
 class Status(str, Enum):
@@ -34,7 +83,35 @@ def read_excel(file_path: Path) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Data frame of the excel file
     """
-    return pd.read_excel(file_path)
+    # only raw cell values are used, so the workbook is opened read only
+    return pd.read_excel(
+        file_path,
+        engine="openpyxl",
+        engine_kwargs={"read_only": True, "data_only": True},
+    )  # pyright: ignore
+
+
+# (path, mtime_ns, size) -> data frame of the last workbook read
+_df_cache: dict[tuple[str, int, int], pd.DataFrame] = {}
+
+
+def read_excel_cached(file_path: Path, copy: bool = True) -> pd.DataFrame:
+    """Read the excel file, reusing the last read while the file is unchanged
+
+    Args:
+        file_path (Path): Path of the excel file
+        copy (bool, optional): Return a copy that is safe to modify. Pass False
+            only when the data frame is just read. Defaults to True.
+
+    Returns:
+        pd.DataFrame: Data frame of the excel file
+    """
+    file_stat = file_path.stat()
+    key = (str(file_path.resolve()), file_stat.st_mtime_ns, file_stat.st_size)
+    if key not in _df_cache:
+        _df_cache.clear()
+        _df_cache[key] = read_excel(file_path)
+    return _df_cache[key].copy() if copy else _df_cache[key]
 
 
 def validate_file_path(file_path: Path) -> bool:
@@ -46,7 +123,13 @@ def validate_file_path(file_path: Path) -> bool:
     Returns:
         bool: True if the file path is valid else False
     """
-    return file_path.exists() and file_path.is_file() and file_path.suffix == ".xlsx"
+    # the suffix check is free, only stat the file when it can pass
+    if file_path.suffix != ".xlsx":
+        return False
+    try:
+        return stat.S_ISREG(file_path.stat().st_mode)
+    except OSError:
+        return False
 
 
 def validate_data_frame(file_path: Path) -> tuple[tuple, bool]:
@@ -59,11 +142,19 @@ def validate_data_frame(file_path: Path) -> tuple[tuple, bool]:
         tuple[tuple, bool]: Tuple of completed and total \
             count and boolean value if the combination column is present
     """
-    with Locking.lock:
+    with Locking.lock.read():
         try:
-            df = read_excel(file_path)
+            # only counted, so the cached frame is used without a copy
+            df = read_excel_cached(file_path, copy=False)
             # if it has combination column or not case insensitive
-            return get_status(df), "combination" in df.columns.str.lower()
+            has_combination = "combination" in df.columns.str.lower()
+            if has_combination and status_sidecar_path(file_path).exists():
+                # an interrupted run left its progress in the sidecar file, count it
+                # the same way load_combination resumes from it
+                df = merge_status_sidecar(
+                    update_combination_status(df.copy()), file_path
+                )
+            return get_status(df), has_combination
         except Exception as e:  # pylint: disable=broad-except
             logging.error("Error while reading file %s %s", file_path, e)
             return (0, 0), False
@@ -84,9 +175,14 @@ def update_combination_status(df: pd.DataFrame) -> pd.DataFrame:
     if "Status" not in df.columns:
         df["Status"] = Status.PENDING.value
     else:
-        df["Status"] = df["Status"].apply(
-            lambda x: Status.PENDING.value if x != Status.COMPLETED.value else x
+        status = df["Status"]
+        df["Status"] = status.where(
+            status == Status.COMPLETED.value, Status.PENDING.value
         )
+    # only two values, so comparisons run on the integer category codes
+    df["Status"] = pd.Categorical(
+        df["Status"], categories=[status.value for status in Status]
+    )
     return df
 
 
@@ -102,10 +198,86 @@ def get_status(df: pd.DataFrame) -> tuple[int, int]:
     total = len(df)
     if "Status" not in df.columns:
         return 0, total
-    completed = len(df[df["Status"] == Status.COMPLETED.value])
+    completed = int((df["Status"].to_numpy() == Status.COMPLETED.value).sum())
     return completed, total
 
 
+def status_sidecar_path(file_path: Path) -> Path:
+    """Get the path of the status sidecar file of the excel file
+
+    Args:
+        file_path (Path): Path of the excel file
+
+    Returns:
+        Path: Path of the csv file holding the in-progress status
+    """
+    return file_path.with_suffix(".status.csv")
+
+
+def save_status_sidecar(df: pd.DataFrame, file_path: Path) -> None:
+    """Save the combination status to the sidecar csv file
+
+    Writing a two column csv is much cheaper than rewriting the whole workbook,
+    so this is used after every group and the excel file is written once at the end.
+
+    Args:
+        df (pd.DataFrame): Data frame with the status of the combination
+        file_path (Path): Path of the excel file the status belongs to
+    """
+    sidecar_path = status_sidecar_path(file_path)
+    tmp_path = sidecar_path.with_suffix(".tmp")
+    with Locking.lock.write():
+        df[["Combination", "Status"]].to_csv(tmp_path, index=False)
+        os.replace(tmp_path, sidecar_path)
+
+
+def merge_status_sidecar(df: pd.DataFrame, file_path: Path) -> pd.DataFrame:
+    """Mark the combinations completed in the sidecar csv file as completed
+
+    Args:
+        df (pd.DataFrame): Data frame with updated status of the combination
+        file_path (Path): Path of the excel file the status belongs to
+
+    Returns:
+        pd.DataFrame: Data frame with the status from the sidecar file applied
+    """
+    sidecar_path = status_sidecar_path(file_path)
+    if not sidecar_path.exists():
+        return df
+    try:
+        saved = pd.read_csv(sidecar_path, dtype=str, keep_default_na=False)
+    except Exception as e:  # pylint: disable=broad-except
+        logging.error("Error while reading status file %s %s", sidecar_path, e)
+        return df
+    if len(saved) != len(df) or "Status" not in saved.columns:
+        logging.warning(
+            "Ignoring status file %s, it does not match the sheet", sidecar_path
+        )
+        return df
+    same_row = (
+        saved["Combination"].to_numpy() == df["Combination"].astype(str).to_numpy()
+    )
+    completed = same_row & (saved["Status"] == Status.COMPLETED.value).to_numpy()
+    df.loc[completed, "Status"] = Status.COMPLETED.value
+    logging.info(
+        "Restored %s completed combination from %s", completed.sum(), sidecar_path
+    )
+    return df
+
+
+def save_combination(df: pd.DataFrame, file_path: Path) -> None:
+    """Write the combination back to the excel file and drop the sidecar file
+
+    Args:
+        df (pd.DataFrame): Data frame with the status of the combination
+        file_path (Path): Path of the excel file to write
+    """
+    with Locking.lock.write():
+        df.astype({"Status": "object"}).to_excel(file_path, index=False)
+        _df_cache.clear()
+        status_sidecar_path(file_path).unlink(missing_ok=True)
+
+
 def load_combination(file_path: Path) -> pd.DataFrame:
     """Load the combination from the excel file and update the status of the combination
 
@@ -120,6 +292,6 @@ def load_combination(file_path: Path) -> pd.DataFrame:
     """
     if not validate_file_path(file_path):
         raise FileNotFoundError(f"Invalid file path {file_path}")
-    df = read_excel(file_path)
+    df = read_excel_cached(file_path)
 
-    return update_combination_status(df)
+    return merge_status_sidecar(update_combination_status(df), file_path)
@@ -1,50 +1,103 @@
 """This module is responsible for creating a session and logging in to the page"""
 
+import json
 import logging
-import pickle
+import os
 from pathlib import Path
 
-from bs4 import BeautifulSoup
 from requests import Response
+from requests.adapters import HTTPAdapter
 from requests.sessions import Session
+from urllib3.util.retry import Retry
 
 from .exception import LoginFailed
-from .utils import get_error, get_soup
+from .utils import get_declared_encoding, get_error_fast
 
+SESSION_FILE_NAME = "session.json"
 
-def session_to_pickle(session: Session | None = None) -> Session | None:
-    """Save the session to a pickle file
+
+def session_to_file(session: Session | None = None) -> Session | None:
+    """Save the session cookies and headers to a json file, or load them back
+
+    Only the cookies and headers are needed to restore the login, so the
+    session object itself is not serialised.
 
     Args:
-        session (Session): Session object to save
+        session (Session, optional): Session object to save. When None the
+            session is loaded from the file instead. Defaults to None.
+
+    Returns:
+        Session | None: The saved or loaded session, None if there is no file
     """
-    cwd = Path.cwd()
-    session_file = cwd / "session.pickle"
+    session_file = Path.cwd() / SESSION_FILE_NAME
     if session is None:
         if session_file.exists() is False:
             logging.error("No session file found")
             return None
-        with open(session_file, "rb") as file:
-            session = pickle.load(file)
-            logging.info("Session loaded from pickle file")
-            return session
-    with open(session_file, "wb") as file:
-        pickle.dump(session, file)
-        logging.info("Session saved to pickle file")
+        try:
+            data = json.loads(session_file.read_text(encoding="utf-8"))
+            session = new_session()
+            session.headers.update(data["headers"])
+            for cookie in data["cookies"]:
+                session.cookies.set(**cookie)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logging.error("Unable to read the session file %s", e)
+            return None
+        logging.info("Session loaded from file")
         return session
 
+    data = {
+        "headers": dict(session.headers),
+        "cookies": [
+            {
+                "name": cookie.name,
+                "value": cookie.value,
+                "domain": cookie.domain,
+                "path": cookie.path,
+            }
+            for cookie in session.cookies
+        ],
+    }
+    # write to a temporary file first so a crash never leaves a torn file
+    tmp_file = session_file.with_suffix(".tmp")
+    tmp_file.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp_file, session_file)
+    logging.info("Session saved to file")
+    return session
 
-def remove_pickle():
-    """Remove the pickle file"""
-    cwd = Path.cwd()
-    session_file = cwd / "session.pickle"
+
+def remove_session_file():
+    """Remove the session file"""
+    session_file = Path.cwd() / SESSION_FILE_NAME
     session_file.unlink(missing_ok=True)
 
 
+def new_session() -> Session:
+    """Create an empty session tuned for the sequential requests of a run
+
+    Every request goes to the same host one after another, so a single pooled
+    keep-alive connection is enough. Failures while connecting are retried
+    because no data has been sent yet, which is safe even for bet posts.
+
+    Returns:
+        Session: Session object without headers or cookies
+    """
+    session: Session = Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=1,
+        max_retries=Retry(
+            total=2, connect=2, read=0, status=0, other=0, backoff_factor=0.5
+        ),
+    )
+    session.mount("https://", adapter)
+    return session
+
+
 def create_session() -> Session:
     """Create a session and return it"""
 
-    session: Session = Session()
+    session: Session = new_session()
     headers: dict[str, str] = {
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",  # pylint: disable=line-too-long
         "Accept-Language": "en-US,en;q=0.9,ta;q=0.8",
@@ -83,7 +136,7 @@ def login_to_page(user_name: str, password: str) -> Session:
     Returns:
         Session: Session object with logged in status
     """
-    session: Session | None = session_to_pickle()
+    session: Session | None = session_to_file()
     if session is not None:
         return session
 
@@ -104,10 +157,9 @@ def login_to_page(user_name: str, password: str) -> Session:
         "https://toto.bg/index.php", params=params, data=data
     )
     response.raise_for_status()
-    soup: BeautifulSoup = get_soup(response.text)
-    if error := get_error(soup):
+    if error := get_error_fast(response.content, get_declared_encoding(response)):
         logging.error("unable to login to the page %s", error)
         raise LoginFailed(error)
     logging.info("Successfully logged in")
 
-    return session_to_pickle(session)  # # pyright: ignore
+    return session_to_file(session)  # # pyright: ignore
@@ -6,6 +6,7 @@ import time
 import traceback
 import urllib.parse
 from pathlib import Path
+from typing import TextIO
 
 import pandas as pd
 from bs4 import BeautifulSoup, NavigableString, ResultSet, Tag
@@ -13,7 +14,14 @@ from requests import Response, Session
 
 from UI.main import PlayPause, UserInputData
 
-from .combination import Status, get_status, load_combination
+from .combination import (
+    Status,
+    get_status,
+    load_combination,
+    save_combination,
+    save_status_sidecar,
+    status_sidecar_path,
+)
 from .exception import (
     BetConfirmationFailed,
     BetPriceHigher,
@@ -23,8 +31,32 @@ from .exception import (
     StopTheCode,
     UnknownError,
 )
-from .login import login_to_page, remove_pickle
-from .utils import get_error, get_soup, is_login_error
+from .login import login_to_page, remove_session_file
+from .utils import (
+    classify_soup,
+    get_declared_encoding,
+    get_error,
+    get_minimal_soup,
+    get_soup,
+    has_error_marker,
+    is_login_error_fast,
+    make_strainer,
+)
+
+_AREA_CLASS_RE = re.compile(r"area area-\d+")  # \d+ matches one or more digits
+
+# index of the 1 / X / 2 value inside each row of a section
+_INDEX_MAPPING: dict[str, int] = {"1": 0, "2": 2, "X": 1, "x": 1}
+
+EXCEL_FLUSH_EVERY: int = 10  # groups between full rewrites of the excel file
+
+GAME_CACHE_TTL: float = 300.0  # seconds a parsed game page is reused
+
+# the verify page is only checked for the error and the confirm talon container
+_CONFIRM_STRAINER = make_strainer("confirm_talon_container")
+
+# url -> (game values, form url, monotonic time it was fetched)
+_game_cache: dict[str, tuple[list[dict], str, float]] = {}
 
 
 def make_request_to_game(
@@ -46,13 +78,16 @@ def make_request_to_game(
     response: Response = session.get(url)
 
     response.raise_for_status()
-    soup: BeautifulSoup = get_soup(response.content)
-
-    if error := get_error(soup):
-        if is_login_error(soup):
-            raise LoginFailed("Login Expired")
-        logging.error("Unable to load the game %s", error)
-        raise GameLoadFailed(error)
+    soup: BeautifulSoup = get_soup(response.content, get_declared_encoding(response))
+
+    # the happy path has no error element, skip walking the soup for it
+    if has_error_marker(response.content):
+        is_login, error = classify_soup(soup)
+        if error:
+            if is_login:
+                raise LoginFailed("Login Expired")
+            logging.error("Unable to load the game %s", error)
+            raise GameLoadFailed(error)
     return soup, response.request.url
 
 
@@ -65,8 +100,7 @@ def get_all_6_section(soup: BeautifulSoup) -> list[dict]:
     Returns:
         list[dict]: List of dictionary with the section name and values
     """
-    re_str: str = r"area area-\d+"  # \d+ matches one or more digits
-    sections: ResultSet = soup.find_all("div", class_=re.compile(re_str))
+    sections: ResultSet = soup.find_all("div", class_=_AREA_CLASS_RE)
     return [get_values_of_section(section) for section in sections]
 
 
@@ -133,6 +167,9 @@ def get_form_url(base_request_url: str, soup: BeautifulSoup) -> str:
 def load_game(session: Session, url: str) -> tuple[list[dict], str]:
     """Load the game and return the game values and the form url
 
+    The parsed game is cached per url for GAME_CACHE_TTL seconds because the
+    sections and the form url do not change between groups of the same run.
+
     Args:
         session (Session): Logged in session
         url (str): The url of the game
@@ -140,13 +177,30 @@ def load_game(session: Session, url: str) -> tuple[list[dict], str]:
     Returns:
         tuple[list[dict], str]: Tuple of game values and the form url to submit the form
     """
+    cached = _game_cache.get(url)
+    if cached is not None and time.monotonic() - cached[2] < GAME_CACHE_TTL:
+        return cached[0], cached[1]
+
     soup, base_request_url = make_request_to_game(session, url)
     game_values: list[dict] = get_all_6_section(soup)
     form_url: str = get_form_url(base_request_url, soup)  # pyright: ignore
 
+    _game_cache[url] = (game_values, form_url, time.monotonic())
     return game_values, form_url
 
 
+def invalidate_game_cache(url: str | None = None) -> None:
+    """Drop the cached game of the url, or every cached game when url is None
+
+    Args:
+        url (str | None, optional): The url of the game. Defaults to None.
+    """
+    if url is None:
+        _game_cache.clear()
+    else:
+        _game_cache.pop(url, None)
+
+
 def play_game(combination: str, section: dict) -> dict[str, list]:
     """Play the game with the combination and the section
 
@@ -157,18 +211,17 @@ def play_game(combination: str, section: dict) -> dict[str, list]:
     Returns:
         dict[str, list]: Dictionary with the section name and the values of the combination
     """
-    index_mapping: dict[str, int] = {"1": 0, "2": 2, "X": 1, "x": 1}
-    combination_to_list: list[str] = [
-        i.strip() for i in combination.split(",") if i.strip()
+    marks: list[str] = [
+        mark for mark in map(str.strip, combination.split(",")) if mark
     ]
-    if len(combination_to_list) != len(section["values"]):
+    if len(marks) != len(section["values"]):
         raise ValueError(
             f"The game in website has {len(section['values'])} \
-                but got for sheet {len(combination_to_list)}"
+                but got for sheet {len(marks)}"
         )
-    result: list[str] = []
-    for mark, values in zip(combination_to_list, section["values"]):
-        result.append(values[index_mapping[mark]])
+    result: list[str] = [
+        values[_INDEX_MAPPING[mark]] for mark, values in zip(marks, section["values"])
+    ]
 
     return {section["name"]: result}
 
@@ -188,7 +241,7 @@ def submit_filled_form(
     """
     response: Response = session.post(form_url, data=data)
     response.raise_for_status()
-    soup: BeautifulSoup = get_soup(response.content)
+    soup: BeautifulSoup = get_soup(response.content, get_declared_encoding(response))
 
     return soup, response.request.url  # pyright: ignore
 
@@ -249,30 +302,70 @@ def extract_form_data(soup: BeautifulSoup) -> tuple[dict[str, str], str]:
     Returns:
         tuple[dict[str, str], str]: Tuple of form data and the form url
     """
-    form_data: dict = {}
     # Find the form with name="talon-bet"
-    form = soup.find("form", attrs={"name": "talon-bet"})
+    form: Tag | None = soup.select_one('form[name="talon-bet"]')
 
-    if not form or not isinstance(form, Tag):
+    if form is None:
         raise ValueError("Form is not found to conform ")
 
     form_url: str = form.get("action", "")  # # pyright: ignore
 
-    inputs: ResultSet = form.find_all("input")
-    for input_tag in inputs:
-        # Get input name and value
-        input_name: str | None = input_tag.get("name")
-        input_value: str = input_tag.get("value", "")
-        if input_name:
-            form_data[input_name] = input_value
+    # only inputs with a non empty name are submitted
+    form_data: dict = {
+        input_tag["name"]: input_tag.get("value", "")
+        for input_tag in form.select('input[name]:not([name=""])')
+    }
 
     return (form_data, form_url)
 
 
+def place_group_bet(
+    session: Session,
+    user_inputs: UserInputData,
+    group: list[str],
+    game: tuple[list[dict], str],
+    confirm_file: TextIO,
+) -> None:
+    """Fill the game with a group of combinations, submit it and confirm the bet
+
+    Args:
+        session (Session): Logged in session
+        user_inputs (UserInputData): The user inputs with the password to verify the bet
+        group (list[str]): Up to 6 combinations, one per section of the game
+        game (tuple[list[dict], str]): Game values and form url from load_game
+        confirm_file (TextIO): Open file the confirmed bets are appended to
+
+    Raises:
+        ValueError: If the game doesn't have 6 sections
+    """
+    game_data, form_url = game
+    process_form_data: dict = {}
+
+    if len(game_data) != 6:
+        raise ValueError(
+            f"Group and game data length is not equal instead of 6 we got {len(game_data)}",
+        )
+    for comb, section in zip(group, game_data):
+        # print(group, section)
+        process_form_data.update(play_game(comb, section))
+        logging.info("Combination %s", comb)
+
+    print(process_form_data)
+    # we need to submit the form
+    soup, verify_base_url = submit_filled_form(session, form_url, process_form_data)
+    validate_filled_combination(soup)
+    verify_data, verify_tail_url = extract_form_data(soup)
+    verify_url: str = urllib.parse.urljoin(verify_base_url, verify_tail_url)
+    verify_data["talon_password"] = user_inputs.password
+    logging.info("next step is to verify the bet")
+    accept_verify(session, verify_url, verify_data, confirm_file)
+
+
 def process_combination(  # pylint: disable=too-many-locals
     session: Session,
     user_inputs: UserInputData,
     combination: pd.DataFrame,
+    confirm_file: TextIO,
 ):
     """Process the combination and play the game with the combination
 
@@ -281,53 +374,61 @@ def process_combination(  # pylint: disable=too-many-locals
         combination (pd.DataFrame): The combination to play the game with the status
         password (str): The password to verify the bet in the game
         combination_path (Path): The path of the combination file to update the status
+        confirm_file (TextIO): Open file the confirmed bets are appended to
     """
     current_processed_combination: int = 0
-    grouped_combination = combination[combination["Status"] == Status.PENDING.value]
-    grouped_combination = grouped_combination["Combination"].tolist()
-    grouped_combination = [
-        grouped_combination[i : i + 6] for i in range(0, len(grouped_combination), 6)
-    ]
-    for group in grouped_combination:
-        game_data, form_url = load_game(session, user_inputs.game_url)
-        process_form_data: dict = {}
-
-        if len(game_data) != 6:
-            raise ValueError(
-                f"Group and game data length is not equal instead of 6 we got {len(game_data)}",
+    dirty_groups: int = 0
+    invalidate_game_cache(user_inputs.game_url)
+    # slicing the numpy arrays below gives views, no per group copies
+    pending_mask = combination["Status"].to_numpy() == Status.PENDING.value
+    pending_values = combination["Combination"].to_numpy()[pending_mask]
+    pending_index = combination.index.to_numpy()[pending_mask]
+    for start in range(0, len(pending_values), 6):
+        group: list[str] = pending_values[start : start + 6].tolist()
+        group_index = pending_index[start : start + 6]
+        try:
+            place_group_bet(
+                session,
+                user_inputs,
+                group,
+                load_game(session, user_inputs.game_url),
+                confirm_file,
             )
-        for comb, section in zip(group, game_data):
-            # print(group, section)
-            process_form_data.update(play_game(comb, section))
-            logging.info("Combination %s", comb)
-
-        print(process_form_data)
-        # we need to submit the form
-        soup, verify_base_url = submit_filled_form(session, form_url, process_form_data)
-        validate_filled_combination(soup)
-        verify_data, verify_tail_url = extract_form_data(soup)
-        verify_url: str = urllib.parse.urljoin(verify_base_url, verify_tail_url)
-        verify_data["talon_password"] = user_inputs.password
-        logging.info("next step is to verify the bet")
-        accept_verify(session, verify_url, verify_data)
+        except CombinationFailed as e:
+            # nothing was confirmed yet, the cached form may be stale so retry the
+            # group once with a freshly loaded game before giving up
+            logging.warning("Retrying the group with a fresh game page %s", e)
+            invalidate_game_cache(user_inputs.game_url)
+            place_group_bet(
+                session,
+                user_inputs,
+                group,
+                load_game(session, user_inputs.game_url),
+                confirm_file,
+            )
+        except BetConfirmationFailed:
+            # the bet may have gone through, never resend it, just drop the cache
+            invalidate_game_cache(user_inputs.game_url)
+            raise
         logging.info("Successfully verified the bet")
         # update df status to completed
-        combination.loc[combination["Combination"].isin(group), "Status"] = (
-            Status.COMPLETED.value
-        )
+        combination.loc[group_index, "Status"] = Status.COMPLETED.value
         current_processed_combination += len(group)
-        # update the file
-        from .combination import Locking  # pylint: disable=import-outside-toplevel
-
-        with Locking.lock:
-            combination.to_excel(user_inputs.filename, index=False)
-            # get_status
-            completed, total = get_status(combination)
-            user_inputs.app_object.update_progress(total, completed)
-            user_inputs.app_object.sidebar_frame.timer.combination_process = (
-                current_processed_combination
-            )
-            delay_time = user_inputs.app_object.sidebar_frame.get_delay_value()
+        # persist the status cheaply, the excel file is only rewritten
+        # every EXCEL_FLUSH_EVERY groups and once more at the end
+        dirty_groups += 1
+        if dirty_groups >= EXCEL_FLUSH_EVERY:
+            save_combination(combination, Path(user_inputs.filename))
+            dirty_groups = 0
+        else:
+            save_status_sidecar(combination, Path(user_inputs.filename))
+        # get_status
+        completed, total = get_status(combination)
+        user_inputs.app_object.update_progress(total, completed)
+        user_inputs.app_object.sidebar_frame.timer.set_combination_process(
+            current_processed_combination
+        )
+        delay_time = user_inputs.app_object.sidebar_frame.get_delay_value()
 
         logging.info(
             "Successfully completed the bet of a group and sleeping for %s seconds",
@@ -342,13 +443,16 @@ def process_combination(  # pylint: disable=too-many-locals
     logging.info("Successfully completed the bet of all the groups")
 
 
-def accept_verify(session: Session, url: str, data: dict[str, str]) -> Response:
+def accept_verify(
+    session: Session, url: str, data: dict[str, str], confirm_file: TextIO
+) -> Response:
     """Accept the verify and confirm the bet in the game
 
     Args:
         session (Session): Logged in session
         url (str): The url to accept the verify and confirm the bet
         data (dict[str, str]): The data to accept the verify and confirm the bet with the password
+        confirm_file (TextIO): Open file the confirm talon container is appended to
 
     Raises:
         BetConfirmationFailed: If the bet confirmation is failed in the game
@@ -358,7 +462,9 @@ def accept_verify(session: Session, url: str, data: dict[str, str]) -> Response:
     """
     response: Response = session.post(url, data=data)
     response.raise_for_status()
-    soup: BeautifulSoup = get_soup(response.content)
+    soup: BeautifulSoup = get_minimal_soup(
+        response.content, _CONFIRM_STRAINER, get_declared_encoding(response)
+    )
     if error := get_error(soup):
         logging.error("Unable to accept the verify %s", error)
         raise BetConfirmationFailed(error)
@@ -366,13 +472,11 @@ def accept_verify(session: Session, url: str, data: dict[str, str]) -> Response:
     confirm_talon_container: Tag | None = soup.select_one(".confirm_talon_container")
     if not confirm_talon_container:
         raise BetConfirmationFailed("Unable to find the confirm talon container")
-    # append to the confirm talon container
-    file_path: Path = Path.cwd() / "confirm_talon_container.html"
     # append the confirm talon container to the file
     try:
-        with open(file_path, "a", encoding="utf-8") as file:
-            file.write("<br>" * 2)
-            file.write(str(confirm_talon_container))
+        confirm_file.write("<br>" * 2 + str(confirm_talon_container))
+        # the app can be closed mid run, keep every confirmed bet on disk
+        confirm_file.flush()
     except Exception as e:  # pylint: disable=broad-except
         logging.error("Unable to write the confirm talon container to the file %s", e)
     return response
@@ -390,8 +494,9 @@ def check_login(session: Session, game_url: str) -> bool:
     """
     response: Response = session.get(game_url)
     response.raise_for_status()
-    soup: BeautifulSoup = get_soup(response.content)
-    return not is_login_error(soup)
+    return not is_login_error_fast(
+        response.content, get_declared_encoding(response)
+    )
 
 
 def create_login_session(username: str, password: str, game_url: str) -> Session:
@@ -413,7 +518,7 @@ def create_login_session(username: str, password: str, game_url: str) -> Session
         if check_login(session, game_url):
             return session
 
-        remove_pickle()
+        remove_session_file()
         logging.error("Unable to login to the page so retrying attempt %s", attempt)
 
     raise LoginFailed("Unable to login to the page")
@@ -430,7 +535,14 @@ def play_game_main(user_inputs: UserInputData):
     session: Session = create_login_session(
         user_inputs.user_name, user_inputs.password, user_inputs.game_url
     )
-    process_combination(session, user_inputs, combination)
+    confirm_path: Path = Path.cwd() / "confirm_talon_container.html"
+    try:
+        with open(confirm_path, "a", encoding="utf-8") as confirm_file:
+            process_combination(session, user_inputs, combination, confirm_file)
+    finally:
+        # flush the progress kept in the sidecar file into the excel file
+        if status_sidecar_path(combination_path).exists():
+            save_combination(combination, combination_path)
 
 
 def to_pause(user_inputs: UserInputData) -> bool:
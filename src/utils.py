@@ -2,11 +2,74 @@
 This module contains utility functions that are used in the main module.
 """
 
-from bs4 import BeautifulSoup, NavigableString, Tag
+import codecs
+import logging
+import re
+import sys
+from typing import NamedTuple
+
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer, Tag
+from lxml import etree  # pyright: ignore  # pylint: disable=no-name-in-module
+from requests import Response
 
 bs4_find_type = Tag | NavigableString | None
 
 
+class PageStatus(NamedTuple):
+    """Login form and error message found on a page"""
+
+    is_login: bool
+    error: str | None
+
+
+_PARSER: str = "lxml"
+
+_SCAN_CHUNK_SIZE: int = 16 * 1024  # bytes fed to the status scanner at a time
+
+# one interned constant for every lookup instead of literals repeated per helper
+_ERROR_CLASS: str = sys.intern("error")
+_LOGIN_FORM_ID: str = sys.intern("login-form")
+
+# results kept on the soup itself, Tag hashes its whole markup so it can't be a key.
+# read through vars(), a missing attribute on a soup is looked up as a child tag
+_ERROR_MEMO: str = "_utils_error"
+_LOGIN_FORM_MEMO: str = "_utils_login_form"
+
+# built once instead of on every find call over an already parsed soup
+_ERROR_FILTER = SoupStrainer(class_=_ERROR_CLASS)
+_LOGIN_FORM_FILTER = SoupStrainer(id=_LOGIN_FORM_ID)
+
+_CHARSET_RE = re.compile(r"""charset\s*=\s*["']?([\w.:-]+)""", re.IGNORECASE)
+
+# cheap byte level markers, a page without them can't contain the matching element
+_ERROR_MARKER_RE = re.compile(rb"""class\s*=\s*["']?[^"'>]*\berror\b""", re.IGNORECASE)
+_LOGIN_FORM_MARKER_RE = re.compile(rb"""id\s*=\s*["']?login-form\b""", re.IGNORECASE)
+
+
+def has_error_marker(content: bytes) -> bool:
+    """Check the raw response for an element with the error class without parsing it
+
+    Args:
+        content (bytes): Response from the request example response.content
+
+    Returns:
+        bool: False if the response surely has no error element else True
+    """
+    return _ERROR_MARKER_RE.search(content) is not None
+
+
+def has_login_form_marker(content: bytes) -> bool:
+    """Check the raw response for the login form without parsing it
+
+    Args:
+        content (bytes): Response from the request example response.content
+
+    Returns:
+        bool: False if the response surely has no login form else True
+    """
+    return _LOGIN_FORM_MARKER_RE.search(content) is not None
+
+
 def get_error(soup: BeautifulSoup) -> str | None:
     """Get the error message from the soup
 
@@ -16,22 +79,285 @@ def get_error(soup: BeautifulSoup) -> str | None:
     Returns:
         str | None: Error message if found else None
     """
-    error: bs4_find_type = soup.find(class_="error")
-    if isinstance(error, Tag):
-        return error.string
-    return None
+    memo: dict = vars(soup)
+    if _ERROR_MEMO in memo:
+        return memo[_ERROR_MEMO]
+    error: bs4_find_type = soup.find(_ERROR_FILTER)
+    # exact type compare, find only returns plain Tags or None here
+    if error.__class__ is Tag:
+        memo[_ERROR_MEMO] = error.string  # pyright: ignore
+    else:
+        memo[_ERROR_MEMO] = None
+    return memo[_ERROR_MEMO]
+
+
+def get_declared_encoding(response: Response) -> str | None:
+    """Get the charset declared in the Content-Type header of the response
+
+    Args:
+        response (Response): Response from the request
+
+    Returns:
+        str | None: Declared charset if present and known else None
+    """
+    match: re.Match[str] | None = _CHARSET_RE.search(
+        response.headers.get("Content-Type", "")
+    )
+    if match is None:
+        return None
+    try:
+        # lxml and bytes.decode raise on an unknown name, let the parser detect it
+        codecs.lookup(match.group(1))
+    except LookupError:
+        logging.warning("Ignoring unknown charset %s", match.group(1))
+        return None
+    return match.group(1)
+
+
+class _StopParsing(Exception):
+    """Raised by _StatusTarget to abort the parser once everything is found"""
+
+
+class _StatusTarget:  # pylint: disable=too-many-instance-attributes
+    """lxml parser target looking for the login form and the first error message
+
+    No tree is built, and the parsing stops as soon as the wanted elements are seen.
+    The error message follows bs4's Tag.string, so it's None unless the error
+    element holds a single text, directly or through single child tags.
+    """
+
+    def __init__(self, want_login: bool, want_error: bool) -> None:
+        self.want_login: bool = want_login
+        self.want_error: bool = want_error
+        self.is_login: bool = False
+        self.error: str | None = None
+        self._error_done: bool = False
+        # children counted per open element while inside the first error element
+        self._child_counts: list[int] = []
+        self._single_child: bool = True
+        self._last_was_text: bool = False
+        self._error_text: list[str] = []
+
+    def start(self, _tag: str, attrib: dict[str, str]) -> None:
+        """Called by lxml for every opening tag"""
+        if attrib.get("id") == _LOGIN_FORM_ID:
+            self.is_login = True
+            self._stop_if_done()
+        if self._child_counts:
+            self._child_counts[-1] += 1
+            self._child_counts.append(0)
+        elif (
+            not self._error_done
+            and _ERROR_CLASS in attrib.get("class", "").split()
+        ):
+            self._child_counts.append(0)
+        self._last_was_text = False
+
+    def end(self, _tag: str) -> None:
+        """Called by lxml for every closing tag"""
+        self._last_was_text = False
+        if not self._child_counts:
+            return
+        if self._child_counts.pop() != 1:
+            self._single_child = False
+        if not self._child_counts:
+            self._error_done = True
+            if self._single_child:
+                self.error = "".join(self._error_text)
+            self._stop_if_done()
+
+    def data(self, data: str) -> None:
+        """Called by lxml for the text between the tags"""
+        if not self._child_counts:
+            return
+        # lxml may hand over one text in several pieces
+        if not self._last_was_text:
+            self._child_counts[-1] += 1
+            self._last_was_text = True
+        self._error_text.append(data)
+
+    def comment(self, text: str) -> None:
+        """Called by lxml for comments, bs4 counts them as a text child"""
+        if self._child_counts:
+            self._child_counts[-1] += 1
+            self._last_was_text = False
+            self._error_text.append(text)
+
+    def close(self) -> None:
+        """Called by lxml at the end of the document"""
+
+    def _stop_if_done(self) -> None:
+        if (self.is_login or not self.want_login) and (
+            self._error_done or not self.want_error
+        ):
+            raise _StopParsing
+
+
+def _scan_status(
+    response: bytes,
+    encoding: str | None,
+    want_login: bool = True,
+    want_error: bool = True,
+) -> PageStatus:
+    target = _StatusTarget(want_login, want_error)
+    try:
+        parser = etree.HTMLParser(target=target, encoding=encoding)
+    except LookupError:
+        # a python codec name libxml2 doesn't know, let it detect the charset itself
+        parser = etree.HTMLParser(target=target)
+    try:
+        # feed in chunks so the rest of a large page isn't even handed to lxml
+        for start in range(0, len(response), _SCAN_CHUNK_SIZE):
+            parser.feed(response[start : start + _SCAN_CHUNK_SIZE])
+        if response:
+            parser.close()
+    except _StopParsing:
+        pass
+    return PageStatus(target.is_login, target.error)
+
+
+def is_login_error_fast(
+    response: bytes, encoding: str | None = None, head: int | None = None
+) -> bool:
+    """Check if the login form is present, parsing only if the raw response may have it
+
+    Args:
+        response (bytes): Response from the request example response.content
+        encoding (str | None, optional): Known encoding of the bytes. Defaults to None.
+        head (int | None, optional): Only look at the first head bytes,
+            bounds the cost on large pages but misses a login form placed after them.
+            Defaults to None, the whole response.
+
+    Returns:
+        bool: True if login form is present else False
+    """
+    if head is not None:
+        response = response[:head]
+    if not has_login_form_marker(response):
+        return False
+    return _scan_status(response, encoding, want_error=False).is_login
+
+
+def get_error_fast(response: bytes, encoding: str | None = None) -> str | None:
+    """Get the error message, parsing only when the raw response may have one
+
+    Args:
+        response (bytes): Response from the request example response.content
+        encoding (str | None, optional): Known encoding of the bytes. Defaults to None.
+
+    Returns:
+        str | None: Error message if found else None
+    """
+    if not has_error_marker(response):
+        return None
+    return _scan_status(response, encoding, want_login=False).error
+
+
+def _is_status_tag(tag: Tag) -> bool:
+    return tag.get("id") == _LOGIN_FORM_ID or _ERROR_CLASS in (
+        tag.get("class") or ()
+    )
 
 
-def get_soup(response: str | bytes) -> BeautifulSoup:
+_STATUS_FILTER = SoupStrainer(_is_status_tag)
+
+
+def classify_soup(soup: BeautifulSoup) -> PageStatus:
+    """Check the login form and the error message of the soup in a single walk
+
+    Args:
+        soup (BeautifulSoup): Soup object to search for the login form and the error
+
+    Returns:
+        PageStatus: True if login form is present, error message if found
+    """
+    memo: dict = vars(soup)
+    if _LOGIN_FORM_MEMO in memo and _ERROR_MEMO in memo:
+        return PageStatus(memo[_LOGIN_FORM_MEMO], memo[_ERROR_MEMO])
+    is_login: bool = False
+    error: str | None = None
+    found_error: bool = False
+    for tag in soup.find_all(_STATUS_FILTER):
+        if tag.get("id") == _LOGIN_FORM_ID:
+            is_login = True
+        if not found_error and _ERROR_CLASS in (tag.get("class") or ()):
+            # only the first error counts, like get_error
+            found_error = True
+            error = tag.string
+    memo[_LOGIN_FORM_MEMO], memo[_ERROR_MEMO] = is_login, error
+    return PageStatus(is_login, error)
+
+
+def get_soup(response: str | bytes, encoding: str | None = None) -> BeautifulSoup:
     """Get the soup object from the response
 
+    Prefer response.content with the declared encoding, requests decoding the
+    whole page into response.text first is an extra pass over it.
+
     Args:
         response (str | bytes): Response from the request example response.text or response.content
+        encoding (str | None, optional): Known encoding of the bytes, skips the charset
+            detection. Ignored for str. Defaults to None.
+
+    Returns:
+        BeautifulSoup: Soup object from the response
+    """
+    return _parse_soup(response, encoding)
+
+
+def make_strainer(*classes: str) -> SoupStrainer:
+    """Build a strainer keeping only the error and the elements with the given classes
+
+    Args:
+        *classes (str): Extra classes the caller needs in the soup
 
     Returns:
-        BeautifulSoup: Soup object from the response using html.parser
+        SoupStrainer: Strainer to pass to get_minimal_soup
     """
-    return BeautifulSoup(response, "html.parser")
+    wanted: frozenset[str] = frozenset(classes) | {_ERROR_CLASS}
+
+    # bs4 passes the raw attribute while parsing, class is a single string there
+    # and only split into a list on the built tags
+    def matches(value: str | list[str] | None) -> bool:
+        if isinstance(value, str):
+            value = value.split()
+        return value is not None and not wanted.isdisjoint(value)
+
+    # a callable on the attribute value behaves the same on every bs4 >= 4.12
+    return SoupStrainer(class_=matches)
+
+
+def get_minimal_soup(
+    response: str | bytes,
+    strainer: SoupStrainer,
+    encoding: str | None = None,
+) -> BeautifulSoup:
+    """Get a soup holding only the elements the strainer keeps
+
+    Args:
+        response (str | bytes): Response from the request example response.text or response.content
+        strainer (SoupStrainer): Strainer built with make_strainer
+        encoding (str | None, optional): Known encoding of the bytes. Defaults to None.
+
+    Returns:
+        BeautifulSoup: Soup object with the kept elements
+    """
+    return _parse_soup(response, encoding, strainer)
+
+
+def _parse_soup(
+    response: str | bytes,
+    encoding: str | None,
+    parse_only: SoupStrainer | None = None,
+) -> BeautifulSoup:
+    if encoding is None or isinstance(response, str):
+        return BeautifulSoup(response, _PARSER, parse_only=parse_only)
+    return BeautifulSoup(
+        response,  # pyright: ignore
+        _PARSER,
+        parse_only=parse_only,
+        from_encoding=encoding,
+    )
 
 
 # create a decorator to handle the login error
@@ -44,5 +370,9 @@ def is_login_error(soup: BeautifulSoup) -> bool:
     Returns:
         bool: True if login error is present else False
     """
-    login_form: bs4_find_type = soup.find(id="login-form")
-    return isinstance(login_form, Tag)
+    memo: dict = vars(soup)
+    if _LOGIN_FORM_MEMO in memo:
+        return memo[_LOGIN_FORM_MEMO]
+    login_form: bs4_find_type = soup.find(_LOGIN_FORM_FILTER)
+    memo[_LOGIN_FORM_MEMO] = login_form.__class__ is Tag
+    return memo[_LOGIN_FORM_MEMO]